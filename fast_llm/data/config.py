@@ -1,4 +1,5 @@
 import enum
+import multiprocessing.context
 
 
 class MultiprocessingContext(enum.StrEnum):
@@ -7,3 +8,23 @@ class MultiprocessingContext(enum.StrEnum):
     fork = "fork"
     # Safe but much slower.
     spawn = "spawn"
+    # Safe, and workers are forked from a server with the heavy imports already loaded.
+    forkserver = "forkserver"
+
+    def get_context(self) -> multiprocessing.context.BaseContext:
+        context = multiprocessing.get_context(self.value)
+        if self == MultiprocessingContext.forkserver:
+            # Only effective before the server starts, i.e., for the first data loader.
+            # This replaces the default `["__main__"]`, which avoids re-importing the entry point in every worker.
+            context.set_forkserver_preload(
+                [
+                    "__main__",
+                    "torch",
+                    "fast_llm.config",
+                    "fast_llm.data.dataset.config",
+                    "fast_llm.data.dataset.sampled",
+                    "fast_llm.data.data.gpt.data",
+                    "fast_llm.layers.language_model.config",
+                ]
+            )
+        return context
@@ -32,8 +32,8 @@ class GPTDataConfig(DataConfig, SamplingConfigBase):
         valid=check_field(Assert.gt, 0),
     )
     multiprocessing_context: MultiprocessingContext = Field(
-        default=MultiprocessingContext.spawn,
-        desc="Multiprocessing context. Do not touch.",
+        default=MultiprocessingContext.forkserver,
+        desc="Multiprocessing context for the data loader workers. Do not touch.",
         hint=FieldHint.expert,
     )
     seed: int = Field(
@@ -1,6 +1,5 @@
 import enum
 import functools
-import itertools
 import logging
 import math
 import pathlib
@@ -92,16 +91,19 @@ class SamplingConfig(SamplingConfigBase):
     dataset_name: str = Field(default="dataset")
     world_size: int = Field(default=1)
     rank: int = Field(default=0)
-    _rank_counter: typing.Iterator[int] = Field(init=False)
+    _rank_counter: list[int] = Field(init=False)
 
     def _validate(self):
-        # Using itertools.count to make the field mutable.
-        self._rank_counter = itertools.count()
+        # Using a list to make the field mutable. Unlike `itertools.count`, it can also be pickled.
+        self._rank_counter = [0]
         super()._validate()
 
     def is_running_next(self) -> bool:
         # Counter that loops over ranks to try to distribute workloads evenly between ranks.
-        return next(self._rank_counter) % self.world_size == self.rank
+        # Every rank runs the same sequence of calls, so the counters stay in sync without communication.
+        index = self._rank_counter[0]
+        self._rank_counter[0] += 1
+        return index % self.world_size == self.rank
 
     @functools.cached_property
     def sample_size(self) -> int:
@@ -168,7 +170,7 @@ class ConcatenatedDatasetConfig[DocumentType: Document](SamplableDatasetConfig[D
         default_factory=list,
         desc="The datasets to concatenate.",
         hint=FieldHint.core,
-        valid=check_field(functools.partial(Assert.custom, lambda x: len(x) > 0)),
+        valid=check_field(Assert.not_empty),
     )
 
     def build(self) -> "ConcatenatedDataset":
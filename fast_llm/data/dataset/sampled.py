@@ -62,6 +62,14 @@ class MemmapArray:
             assert self.exists(), self._path
             self._array = np.load(self._path, mmap_mode="r")
 
+    def __getstate__(self) -> tuple[pathlib.Path | None, np.ndarray | None]:
+        # Pickling a memmap copies its whole content, ex. to every data loader worker.
+        # File-backed arrays only need the path, and are re-mapped lazily in the receiving process.
+        return self._path, self._array if self._path is None else None
+
+    def __setstate__(self, state: tuple[pathlib.Path | None, np.ndarray | None]):
+        self._path, self._array = state
+
 
 class SampledIndexedDataset[DocumentType: Document](SampledDataset[DocumentType]):
     """
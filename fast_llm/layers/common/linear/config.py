@@ -206,12 +206,11 @@ class CausalConv1dConfig(AffineLinearBaseConfig):
 
         kernel_dim = TensorDim("convolution_kernel", self.kernel_size)
 
+        default_scale = (in_dim.global_size * kernel_dim.global_size) ** -0.5
         if default_weight_initialization is None:
-            default_weight_initialization = init_uniform_centered_(
-                (in_dim.global_size * kernel_dim.global_size) ** -0.5
-            )
+            default_weight_initialization = init_uniform_centered_(default_scale)
         if default_bias_initialization is None:
-            default_bias_initialization = init_uniform_centered_((in_dim.global_size * kernel_dim.global_size) ** -0.5)
+            default_bias_initialization = init_uniform_centered_(default_scale)
 
         lr_scale = (combine_lr_scales(lr_scale, self.lr_scale),)
         weight = self.weight.get_parameter(
@@ -193,6 +193,10 @@ class LanguageModelHeadConfig(BlockConfig):
     def _validate(self) -> None:
         super()._validate()
         assert LM_HEAD_LOSS_NAME not in self.losses
+        if self.prediction_loss_coefficient is not None:
+            Assert.eq(len(self.prediction_loss_coefficient), self.prediction_heads)
+            for coefficient in self.prediction_loss_coefficient:
+                Assert.geq(coefficient, 0)
         # `get_effective_losses` synthesizes fused-group names `monolithic` / `monolithic_<index>`; keep them reserved.
         assert not any(
             name == "monolithic" or (name.startswith("monolithic_") and name.removeprefix("monolithic_").isdigit())
@@ -3,6 +3,8 @@ import itertools
 import logging
 import math
 import os
+import pathlib
+import shutil
 import signal
 import typing
 import warnings
@@ -59,8 +61,12 @@ def format_number(x: float | int, prec=4, exp_threshold=3) -> str:
 def padded_cumsum(x: "npt.ArrayLike") -> "np.ndarray":
     import numpy as np
 
-    y = np.hstack((0, x))
-    return y.cumsum(out=y)
+    x = np.asarray(x)
+    # Same dtype as `np.hstack((0, x))`, i.e. at least int64 so small integer types don't overflow.
+    y = np.empty(x.size + 1, dtype=np.promote_types(x.dtype, np.int64))
+    y[0] = 0
+    np.cumsum(x, dtype=y.dtype, out=y[1:])
+    return y
 
 
 def clamp[T](x: T, x_min: T, x_max: T) -> T:
@@ -133,6 +139,10 @@ class Assert:
     def empty(x):
         assert len(x) == 0, f"Not empty (len={len(x)}), {x}"
 
+    @staticmethod
+    def not_empty(x):
+        assert len(x) > 0, f"Empty {type(x).__name__}"
+
     @staticmethod
     def incl(x, y):
         assert x in y, f"{x} not in {list(y)}"
@@ -490,3 +500,22 @@ def safe_merge_dicts(*dicts) -> dict:
                 Assert.eq(value, out[key])
             out[key] = value
     return out
+
+
+def link_or_copy(source: pathlib.Path, destination: pathlib.Path) -> None:
+    """
+    Hard-link `source` to `destination`, or copy it if linking is not possible, replacing any existing file.
+    """
+    if destination.exists() and destination.samefile(source):
+        # Already linked, ex. when restaging after an interrupted run. Renaming a link over itself is a no-op,
+        # which would leave the temporary file behind.
+        return
+    # Stage under a temporary name and rename over the destination, so it is never missing or partially written.
+    tmp_destination = destination.with_name(destination.name + ".tmp")
+    tmp_destination.unlink(missing_ok=True)
+    try:
+        tmp_destination.hardlink_to(source)
+    except OSError:
+        # Hard links may be unavailable, ex. across filesystems or on files we don't own (`protected_hardlinks`).
+        shutil.copy(source, tmp_destination)
+    tmp_destination.replace(destination)
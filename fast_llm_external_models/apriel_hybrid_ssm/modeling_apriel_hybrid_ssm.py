@@ -827,7 +827,9 @@ class DiscreteMamba2(nn.Module):
 
             # Pad input to nearest multiple of chunklen
             padded_len = (1 + (seqlen - 1) // chunk_size) * chunk_size
-            u = F.pad(u, (0, 0, 0, padded_len - seqlen))
+            if padded_len != seqlen:
+                # `F.pad` copies even when there is nothing to pad.
+                u = F.pad(u, (0, 0, 0, padded_len - seqlen))
 
             # Project input
             xBCzA_log = self.in_proj(u)
@@ -860,9 +862,9 @@ class DiscreteMamba2(nn.Module):
                 dim=-1,
             )
 
-            x = rearrange(x, "b l (h n) -> b l h n", h=self.n_v_heads)
-            B = rearrange(B, "b l (h n) -> b l h n", h=self.n_qk_heads)
-            C = rearrange(C, "b l (h n) -> b l h n", h=self.n_qk_heads)
+            x = x.unflatten(-1, (self.n_v_heads, self.headdim))
+            B = B.unflatten(-1, (self.n_qk_heads, self.d_state))
+            C = C.unflatten(-1, (self.n_qk_heads, self.d_state))
 
             # SSM forward
             result = mamba_chunk_scan_combined(
@@ -883,8 +885,8 @@ class DiscreteMamba2(nn.Module):
             else:
                 y = result
 
-            Du = torch.einsum("h,blhp->blhp", self.D, x)
-            y = rearrange(y + Du, "b l h p -> b l (h p)")
+            # Out-of-place: the scan may keep `y` for its backward pass.
+            y = torch.addcmul(y, self.D[:, None], x).flatten(2)
 
             # Norm and gate
             out = self.out_proj(y * F.silu(z + self.z_bias))
@@ -928,9 +930,9 @@ class DiscreteMamba2(nn.Module):
             dim=-1,
         )
 
-        x = rearrange(x, "b (h s) -> b h s", h=self.n_v_heads)
-        B = rearrange(B, "b (h s) -> b h s", h=self.n_qk_heads)
-        C = rearrange(C, "b (h s) -> b h s", h=self.n_qk_heads)
+        x = x.unflatten(-1, (self.n_v_heads, self.headdim))
+        B = B.unflatten(-1, (self.n_qk_heads, self.d_state))
+        C = C.unflatten(-1, (self.n_qk_heads, self.d_state))
 
         ssm_state = ssm_state.to(x.dtype)
         # does nto work with CG, probably becuase zeros and ones are on CPU
@@ -951,7 +953,7 @@ class DiscreteMamba2(nn.Module):
         )
 
         y = y + self.D[:, None] * x
-        y = rearrange(y, "b h p -> b (h p)")
+        y = y.flatten(1)
 
         # Norm and gate
         out = self.out_proj(y * F.silu(z + self.z_bias))
@@ -987,7 +989,7 @@ class DiscreteMamba2(nn.Module):
         else:
             xBC = causal_conv1d_fn(
                 xBC.transpose(1, 2),
-                rearrange(self.conv1d.weight, "d 1 w -> d w"),
+                self.conv1d.weight.squeeze(1),
                 self.conv1d.bias,
                 activation=None if self.activation == "identity" else self.activation,
             ).transpose(1, 2)
@@ -1000,7 +1002,7 @@ class DiscreteMamba2(nn.Module):
             xBC = causal_conv1d_update(
                 xBC,
                 conv_state,
-                rearrange(self.conv1d.weight, "d 1 w -> d w"),
+                self.conv1d.weight.squeeze(1),
                 self.conv1d.bias,
                 self.activation if self.activation != "identity" else None,
             )
@@ -1008,7 +1010,7 @@ class DiscreteMamba2(nn.Module):
         else:
             conv_state.copy_(torch.roll(conv_state, shifts=-1, dims=-1))  # Update state (B D W)
             conv_state[:, :, -1] = xBC
-            xBC = torch.sum(conv_state * rearrange(self.conv1d.weight, "d 1 w -> d w"), dim=-1)  # (B D)
+            xBC = torch.sum(conv_state * self.conv1d.weight.squeeze(1), dim=-1)  # (B D)
             if self.conv_bias:
                 xBC = xBC + self.conv1d.bias
             xBC = self.act(xBC).to(xBC.dtype)  # Some activations change dtype
@@ -1203,7 +1205,7 @@ class Mamba2(nn.Module):
             # variable length path
             x = varlen_causal_conv1d_fn(
                 x.squeeze(0) if cu_seqlens is not None else x,  # Add batch dimension
-                weight=rearrange(self.conv1d.weight, "d 1 w -> d w"),
+                weight=self.conv1d.weight.squeeze(1),
                 bias=self.conv1d.bias,
                 activation=self.activation,
                 conv_states=conv_state,
@@ -1223,7 +1225,7 @@ class Mamba2(nn.Module):
                 assert self.activation in ["silu", "swish"]
                 x = causal_conv1d_fn(
                     x=x,
-                    weight=rearrange(self.conv1d.weight, "d 1 w -> d w"),
+                    weight=self.conv1d.weight.squeeze(1),
                     bias=self.conv1d.bias,
                     activation=self.activation,
                 )
@@ -1300,7 +1302,7 @@ class Mamba2(nn.Module):
             # Update state (B D W)
             conv_state.copy_(torch.roll(conv_state, shifts=-1, dims=-1))
             conv_state[:, :, -1] = x
-            x = torch.sum(conv_state * rearrange(self.conv1d.weight, "d 1 w -> d w"), dim=-1)  # (B D)
+            x = torch.sum(conv_state * self.conv1d.weight.squeeze(1), dim=-1)  # (B D)
             if self.conv1d.bias is not None:
                 x = x + self.conv1d.bias
             x = self.act(x).to(dtype=dtype)
@@ -1308,7 +1310,7 @@ class Mamba2(nn.Module):
             x = causal_conv1d_update(
                 x,
                 conv_state,
-                rearrange(self.conv1d.weight, "d 1 w -> d w"),
+                self.conv1d.weight.squeeze(1),
                 self.conv1d.bias,
                 self.activation,
             )
@@ -1,6 +1,7 @@
 import dataclasses
 import functools
 import pathlib
+import pickle
 
 import numpy as np
 import pytest
@@ -9,6 +10,7 @@ import torch
 from fast_llm.data.dataset.config import ShufflingType
 from fast_llm.data.dataset.gpt.config import GPTDatasetFromFileConfig, GPTSamplingConfig
 from fast_llm.data.dataset.indexed import IndexedDataset
+from fast_llm.data.dataset.sampled import MemmapArray
 from fast_llm.data.document.language_model import LanguageModelBatch, LanguageModelDocument
 from fast_llm.utils import Assert
 from tests.data.common import (
@@ -258,6 +260,32 @@ def test_cache_invalidated_on_config_change(data_result_path: pathlib.Path):
         TEST_DATASET.sample(config_changed, num_samples, seed)
 
 
+def test_memmap_array_pickle(data_result_path: pathlib.Path):
+    # File-backed arrays are pickled by path only, in-memory arrays by value.
+    array = np.arange(10, dtype=np.int64)
+    file_array = MemmapArray(data_result_path / "sampling/memmap_array_pickle.npy")
+    file_array.save(array)
+    Assert.all_equal(file_array.array, array)
+    file_array_copy = pickle.loads(pickle.dumps(file_array))
+    assert file_array_copy._array is None
+    Assert.all_equal(file_array_copy.array, array)
+
+    memory_array = MemmapArray()
+    memory_array.save(array)
+    Assert.all_equal(pickle.loads(pickle.dumps(memory_array)).array, array)
+
+
+def test_sampling_config_pickle():
+    # The rank counter must survive pickling (ex. to data loader workers) and keep its position.
+    config, _, _ = get_sampling_config(20, sequence_length=5)
+    config = GPTSamplingConfig.from_dict(config.to_dict(), {"world_size": 3, "rank": 1})
+    Assert.eq([config.is_running_next() for _ in range(2)], [False, True])
+    config_copy = pickle.loads(pickle.dumps(config))
+    expected = [False, False, True, False, False, True]
+    Assert.eq([config_copy.is_running_next() for _ in range(6)], expected)
+    Assert.eq([config.is_running_next() for _ in range(6)], expected)
+
+
 @pytest.mark.skipif(not _extension_available, reason="CPP Extension not available")
 def test_build_padded_token_cumsum():
     sizes = np.array([100, 256, 580, 600, 550, 89, 339, 430, 400, 795, 680, 50], dtype=np.int32)
@@ -770,3 +770,14 @@ def test_get_effective_losses():
     # `triton` on a set with no shared triton kernel is rejected at config time.
     with pytest.raises(ValueError):
         _head_config({"ce": {"type": "label"}, "d": {"type": "distillation", "reference_model": "t"}}, "triton")
+
+
+def test_prediction_loss_coefficient_validation():
+    config = {"normalization": {"type": "rms_norm"}, "prediction_heads": 2}
+    head_config = LanguageModelHeadConfig.from_dict({**config, "prediction_loss_coefficient": [1.0, 0.5]})
+    Assert.eq(head_config.prediction_loss_coefficient, [1.0, 0.5])
+    # Extra coefficients used to be silently ignored.
+    with pytest.raises(AssertionError):
+        LanguageModelHeadConfig.from_dict({**config, "prediction_loss_coefficient": [1.0, 0.5, 0.25]})
+    with pytest.raises(AssertionError):
+        LanguageModelHeadConfig.from_dict({**config, "prediction_loss_coefficient": [1.0, -0.5]})
@@ -7,6 +7,7 @@ import pytest
 import yaml
 
 from fast_llm.config import NoAutoValidate
+from fast_llm.data.config import MultiprocessingContext
 from fast_llm.data.dataset.config import SamplingConfigBase
 from fast_llm.engine.checkpoint.config import CheckpointSaveMetadataConfig, ModelConfigType
 from fast_llm.engine.distributed.config import DistributedConfig, DistributedDim, DistributedDimNames
@@ -297,3 +298,7 @@ def test_distributed_global_ranks(bdp: int, sdp: int, tp: int, pp: int, pipeline
         Assert.eq(len({global_rank for global_ranks in global_ranks_set for global_rank in global_ranks}), world_size)
 
     Assert.eq(len(rank_breakdowns), world_size)
+
+
+def test_forkserver_multiprocessing_context():
+    Assert.eq(MultiprocessingContext.forkserver.get_context().get_start_method(), "forkserver")
@@ -0,0 +1,33 @@
+import errno
+import pathlib
+
+from fast_llm.utils import Assert, link_or_copy
+
+
+def _hardlink_to_fails(self, target):
+    raise OSError(errno.EPERM, "Operation not permitted")
+
+
+def test_link_or_copy(tmp_path: pathlib.Path):
+    source = tmp_path / "source.json"
+    source.write_text("source")
+    destination = tmp_path / "destination.json"
+    destination.write_text("stale")
+    link_or_copy(source, destination)
+    Assert.eq(destination.read_text(), "source")
+    assert destination.samefile(source)
+    # Restaging an already linked file is a no-op.
+    link_or_copy(source, destination)
+    assert destination.samefile(source)
+    Assert.eq(sorted(path.name for path in tmp_path.iterdir()), ["destination.json", "source.json"])
+
+
+def test_link_or_copy_fallback(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(pathlib.Path, "hardlink_to", _hardlink_to_fails)
+    source = tmp_path / "source.json"
+    source.write_text("source")
+    destination = tmp_path / "destination.json"
+    link_or_copy(source, destination)
+    Assert.eq(destination.read_text(), "source")
+    assert not destination.samefile(source)
+    assert not destination.with_name(destination.name + ".tmp").exists()